@@ -1,22 +1,122 @@
 import sys
 import random
 import json
-from uuid import uuid4
+import re
+from collections import deque
+from itertools import count, islice
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; run the plain Python versions
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib json module
+    orjson = None
+
+def _dump_json(data, filename):
+    if orjson is not None:
+        try:
+            # orjson writes UTF-8 and rejects integers wider than 64 bits
+            encoded = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError:
+            pass
+        else:
+            with open(filename, "wb") as f:
+                f.write(encoded)
+            return
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
 
 # Data Models
 
 CITY_FEATURES = ["port", "university", "factory", "park", "museum", "power plant"]
 
+# Only the most recent events are kept in history and saves
+MAX_EVENTS = 10000
+
+# Possible yearly drift values per city, drawn in batches each tick
+ECON_DRIFT = range(0, 3)
+HAPPINESS_DRIFT = range(-1, 3)
+CRIME_DRIFT = range(-1, 2)
+
+# Cities saturate at this population so pop * 220 in the growth formula
+# stays within int64 when the update functions are compiled by numba
+MAX_CITY_POPULATION = (2**63 - 1) // 220
+
+@njit(cache=True)
+def _update_city(econ, crime, happy, pop, d_crime, d_happy, econ_draw, happy_draw, crime_draw):
+    # Apply law effects
+    crime = max(0, min(100, crime + d_crime))
+    happy = max(0, min(100, happy + d_happy))
+
+    # Economic growth
+    econ = min(100, econ + econ_draw)
+
+    # Happiness and crime random drift
+    happy = max(0, min(100, happy + happy_draw))
+    crime = max(0, min(100, crime + crime_draw))
+
+    # Population growth
+    # Integer form of pop * (0.01 + econ/1000 - crime/2000), truncated toward zero
+    scaled = pop * (20 + 2*econ - crime)
+    growth = scaled // 2000 if scaled >= 0 else -(-scaled // 2000)
+    pop = max(0, min(MAX_CITY_POPULATION, pop + growth))
+    return econ, crime, happy, pop
+
+@njit(cache=True)
+def _simulate_many(econ, crime, happy, pop, years, d_crime, d_happy):
+    # Run one city forward several years without returning to Python in between
+    for _ in range(years):
+        econ, crime, happy, pop = _update_city(
+            econ, crime, happy, pop, d_crime, d_happy,
+            random.randint(0, 2), random.randint(-1, 2), random.randint(-1, 1)
+        )
+    return econ, crime, happy, pop
+
+_KV = re.compile(r"\s*(\w+)\s*:\s*([-+]?\d+)\s*")
+
+def _parse_kv(text):
+    # Parse "key:value" pairs such as "crime:-3, happiness:2"; any malformed
+    # pair raises ValueError rather than being partially read
+    result = {}
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        match = _KV.fullmatch(part)
+        if match is None:
+            raise ValueError(f"invalid entry {part.strip()!r}, expected key:integer")
+        result[match.group(1)] = int(match.group(2))
+    return result
+
+def _resume_ids(counter, ids):
+    # Continue numbering after any integer ids restored from a save
+    start = next(counter)
+    for i in ids:
+        if isinstance(i, int) and i >= start:
+            start = i + 1
+    return count(start)
+
 class Law:
-    def __init__(self, title, description, impact):
-        self.id = str(uuid4())
+    __slots__ = ("id", "title", "description", "impact")
+    _ids = count()
+
+    def __init__(self, title, description, impact, id=None):
+        self.id = next(Law._ids) if id is None else id
         self.title = title
         self.description = description
         self.impact = impact  # e.g. {'crime': -2, 'happiness': +1}
 
 class City:
-    def __init__(self, name, population=1000, features=None, economy=50, crime=10, happiness=50):
-        self.id = str(uuid4())
+    __slots__ = ("id", "name", "population", "economy", "crime", "happiness", "features")
+    _ids = count()
+
+    def __init__(self, name, population=1000, features=None, economy=50, crime=10, happiness=50, id=None):
+        self.id = next(City._ids) if id is None else id
         self.name = name
         self.population = population
         self.economy = economy  # 0-100
@@ -24,27 +124,19 @@ class City:
         self.happiness = happiness  # 0-100
         self.features = features if features else []
 
-    def yearly_update(self, law_effects):
-        # Apply law effects
-        for k, v in law_effects.items():
-            if hasattr(self, k):
-                setattr(self, k, max(0, min(100, getattr(self, k) + v)))
-
-        # Economic growth
-        econ_growth = random.randint(0, 2)
-        self.economy = min(100, self.economy + econ_growth)
-
-        # Happiness and crime random drift
-        self.happiness = max(0, min(100, self.happiness + random.randint(-1, 2)))
-        self.crime = max(0, min(100, self.crime + random.randint(-1, 1)))
-
-        # Population growth
-        growth = int(self.population * (0.01 + self.economy/1000 - self.crime/2000))
-        self.population = max(0, self.population + growth)
+    def yearly_update(self, d_crime, d_happy, econ_draw, happy_draw, crime_draw):
+        self.economy, self.crime, self.happiness, self.population = _update_city(
+            self.economy, self.crime, self.happiness,
+            min(self.population, MAX_CITY_POPULATION), d_crime, d_happy,
+            econ_draw, happy_draw, crime_draw
+        )
 
 class Event:
-    def __init__(self, description, effect, year):
-        self.id = str(uuid4())
+    __slots__ = ("id", "description", "effect", "year")
+    _ids = count()
+
+    def __init__(self, description, effect, year, id=None):
+        self.id = next(Event._ids) if id is None else id
         self.description = description
         self.effect = effect  # e.g. {'food': +100, 'money': -200}
         self.year = year
@@ -56,7 +148,8 @@ class Country:
         self.population = 10000
         self.cities = []
         self.laws = []
-        self.events = []
+        self._law_effects = {"crime": 0, "happiness": 0}
+        self.events = deque(maxlen=MAX_EVENTS)
         self.year = 1 # <- Start at year 1!
         self.resources = {"food": 5000, "money": 10000, "tech": 500, "reputation": 50}
 
@@ -69,22 +162,31 @@ class Country:
         for city in self.cities:
             print(f" - {city.name} | Pop: {city.population} | Econ: {city.economy} | Crime: {city.crime} | Happy: {city.happiness} | Features: {', '.join(city.features)}")
         print(f"Laws: {[law.title for law in self.laws]}")
-        print(f"Recent Events: {[event.description for event in self.events[-3:]]}")
+        recent_events = list(islice(reversed(self.events), 3))[::-1]
+        print(f"Recent Events: {[event.description for event in recent_events]}")
         print("="*34 + "\n")
 
-    def add_city(self, name, population=1000, features=None):
+    def add_city(self, name, population=1000, features=None, verbose=True):
         if features is None:
             features = []
         city = City(name, population, features)
         self.cities.append(city)
         self.population += population
-        print(f"Added city: {city.name} (Population: {city.population})")
+        if verbose:
+            print(f"Added city: {city.name} (Population: {city.population})")
 
     def add_law(self, title, description, impact):
         law = Law(title, description, impact)
         self.laws.append(law)
+        self._apply_law_impact(impact)
         print(f"Enacted law: {law.title}")
 
+    def _apply_law_impact(self, impact):
+        # Keep the cumulative law effects up to date as laws are enacted
+        for k, v in impact.items():
+            if k in self._law_effects:
+                self._law_effects[k] += v
+
     def add_event(self, description, effect):
         event = Event(description, effect, self.year)
         self.events.append(event)
@@ -94,31 +196,38 @@ class Country:
                 self.resources[k] += v
         print(f"Event occurred: {event.description}")
 
-    def simulate_tick(self):
-        print(f"\nSimulating year {self.year}...")
+    def simulate_tick(self, verbose=True):
+        if verbose:
+            print(f"\nSimulating year {self.year}...")
 
-        # Calculate cumulative law effects
-        law_effects = {"crime": 0, "happiness": 0}
-        for law in self.laws:
-            for k, v in law.impact.items():
-                if k in law_effects:
-                    law_effects[k] += v
+        cities = self.cities
+        resources = self.resources
+
+        # Cumulative law effects are maintained by add_law
+        d_crime = self._law_effects["crime"]
+        d_happy = self._law_effects["happiness"]
 
-        # Update cities
+        # Update cities, totalling population and economy in the same pass
         total_population = 0
-        for city in self.cities:
-            city.yearly_update(law_effects)
+        total_economy = 0
+        n = len(cities)
+        econ_draws = random.choices(ECON_DRIFT, k=n)
+        happy_draws = random.choices(HAPPINESS_DRIFT, k=n)
+        crime_draws = random.choices(CRIME_DRIFT, k=n)
+        for city, econ_draw, happy_draw, crime_draw in zip(cities, econ_draws, happy_draws, crime_draws):
+            city.yearly_update(d_crime, d_happy, econ_draw, happy_draw, crime_draw)
             total_population += city.population
+            total_economy += city.economy
 
-        self.population = total_population if self.cities else self.population
+        self.population = total_population if cities else self.population
 
         # National resources change
-        food_produced = sum([city.economy for city in self.cities]) * 5
+        food_produced = total_economy * 5
         food_consumed = self.population // 2
-        self.resources["food"] += food_produced - food_consumed
-        self.resources["money"] += random.randint(-500, 900)
-        self.resources["tech"] += random.randint(0, 30)
-        self.resources["reputation"] = max(0, min(100, self.resources["reputation"] + random.randint(-2, 3)))
+        resources["food"] += food_produced - food_consumed
+        resources["money"] += random.randint(-500, 900)
+        resources["tech"] += random.randint(0, 30)
+        resources["reputation"] = max(0, min(100, resources["reputation"] + random.randint(-2, 3)))
 
         # Random event
         if random.random() < 0.3:
@@ -129,26 +238,29 @@ class Country:
                     {"tech": 100, "reputation": 5},
                     self.year
                 )
-                self.resources["tech"] += 100
-                self.resources["reputation"] += 5
+                resources["tech"] += 100
+                resources["reputation"] += 5
                 self.events.append(evt)
-                print(f"Event: {evt.description}")
+                if verbose:
+                    print(f"Event: {evt.description}")
             else:
                 evt = Event(
                     "A crop blight reduces food stores!",
                     {"food": -300},
                     self.year
                 )
-                self.resources["food"] -= 300
+                resources["food"] -= 300
                 self.events.append(evt)
-                print(f"Event: {evt.description}")
+                if verbose:
+                    print(f"Event: {evt.description}")
 
         # Check for starvation
-        if self.resources["food"] < 0:
+        if resources["food"] < 0:
             lost = min(self.population // 10, self.population)
             self.population -= lost
-            print("Starvation! Population decreased by", lost)
-            self.resources["food"] = 0
+            if verbose:
+                print("Starvation! Population decreased by", lost)
+            resources["food"] = 0
             evt = Event(
                 "Starvation strikes the nation!",
                 {},
@@ -158,8 +270,32 @@ class Country:
 
         # Year advance
         self.year += 1
-        print(f"Year {self.year - 1} complete.")
-        self.status()
+        if verbose:
+            print(f"Year {self.year - 1} complete.")
+            self.status()
+
+    def simulate(self, years, verbose=False):
+        # Run several years in a row, quietly by default for batch projections
+        for _ in range(years):
+            self.simulate_tick(verbose)
+
+    def project(self, years, verbose=False):
+        # Project city populations forward under the current laws without
+        # changing the nation; national resources and events are not modelled
+        d_crime = self._law_effects["crime"]
+        d_happy = self._law_effects["happiness"]
+        total_population = 0
+        for city in self.cities:
+            _, _, _, pop = _simulate_many(
+                city.economy, city.crime, city.happiness,
+                min(city.population, MAX_CITY_POPULATION), years, d_crime, d_happy
+            )
+            total_population += pop
+        if not self.cities:
+            total_population = self.population
+        if verbose:
+            print(f"Projected population in year {self.year + years}: {total_population}")
+        return total_population
 
     def save(self, filename):
         data = {
@@ -185,12 +321,11 @@ class Country:
                 for e in self.events
             ]
         }
-        with open(filename, "w") as f:
-            json.dump(data, f, indent=2)
+        _dump_json(data, filename)
         print(f"Saved nation to {filename}")
 
     def load(self, filename):
-        with open(filename, "r") as f:
+        with open(filename, "r", encoding="utf-8") as f:
             data = json.load(f)
         self.name = data["name"]
         self.description = data["description"]
@@ -201,18 +336,25 @@ class Country:
             City(
                 name=c["name"], population=c["population"],
                 features=c["features"], economy=c["economy"],
-                crime=c["crime"], happiness=c["happiness"]
+                crime=c["crime"], happiness=c["happiness"], id=c["id"]
             )
             for c in data["cities"]
         ]
         self.laws = [
-            Law(title=l["title"], description=l["description"], impact=l["impact"])
+            Law(title=l["title"], description=l["description"], impact=l["impact"], id=l["id"])
             for l in data["laws"]
         ]
-        self.events = [
-            Event(description=e["description"], effect=e["effect"], year=e["year"])
-            for e in data["events"]
-        ]
+        self._law_effects = {"crime": 0, "happiness": 0}
+        for law in self.laws:
+            self._apply_law_impact(law.impact)
+        self.events = deque(
+            (Event(description=e["description"], effect=e["effect"], year=e["year"], id=e["id"])
+             for e in data["events"]),
+            maxlen=MAX_EVENTS
+        )
+        City._ids = _resume_ids(City._ids, (c.id for c in self.cities))
+        Law._ids = _resume_ids(Law._ids, (l.id for l in self.laws))
+        Event._ids = _resume_ids(Event._ids, (e.id for e in self.events))
         print(f"Loaded nation from {filename}")
 
 def menu():
@@ -249,21 +391,21 @@ def main():
             description = input("Description: ")
             print("Enter impact on cities (e.g., crime:-3,happiness:2): ")
             impact_raw = input("Impact: ")
-            impact = {}
-            for part in impact_raw.split(","):
-                if ":" in part:
-                    k, v = part.split(":")
-                    impact[k.strip()] = int(v.strip())
+            try:
+                impact = _parse_kv(impact_raw)
+            except ValueError as e:
+                print(f"Invalid impact: {e}")
+                continue
             country.add_law(title, description, impact)
         elif choice == "4":
             description = input("Event description: ")
             print("Enter effect on resources (e.g., food:-100,money:200): ")
             effect_raw = input("Effect: ")
-            effect = {}
-            for part in effect_raw.split(","):
-                if ":" in part:
-                    k, v = part.split(":")
-                    effect[k.strip()] = int(v.strip())
+            try:
+                effect = _parse_kv(effect_raw)
+            except ValueError as e:
+                print(f"Invalid effect: {e}")
+                continue
             country.add_event(description, effect)
         elif choice == "5":
             country.simulate_tick()